@@ -1,57 +1,126 @@
-"""Orchestrate a full database build: init schema, scrape both doc sites, validate."""
+"""Orchestrate a database build: init schema, scrape both doc sites, validate."""
 
+import argparse
 import asyncio
 import shutil
+import sqlite3
 import sys
 from pathlib import Path
 
 # Add parent dir so we can import the package
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
 
-from griptape_mcp.db import init_db
+from griptape_mcp.db import (
+    check_schema,
+    drop_fts_triggers,
+    get_writable_connection,
+    init_db,
+    optimize_db,
+    rebuild_fts,
+)
 
+from scrape_common import close_client, close_executor, compress_stored_html
 from scrape_framework import scrape as scrape_framework
 from scrape_nodes import scrape as scrape_nodes
 from scrape_nodes_github import scrape as scrape_nodes_github
 
 
-async def build(output_path: Path):
-    # Remove old DB if it exists
-    if output_path.exists():
+async def scrape_nodes_with_fallback(conn: sqlite3.Connection) -> dict:
+    """Scrape nodes docs - try website first, fall back to GitHub markdown."""
+    try:
+        nodes_stats = await scrape_nodes(conn)
+        if nodes_stats["errors"] > nodes_stats["pages"] + nodes_stats["unchanged"]:
+            print("[build] Too many errors from website, falling back to GitHub source...")
+            nodes_stats = await scrape_nodes_github(conn)
+    except Exception as e:
+        print(f"[build] Website scrape failed ({e}), falling back to GitHub source...")
+        nodes_stats = await scrape_nodes_github(conn)
+    return nodes_stats
+
+
+async def build(output_path: Path, force: bool = False):
+    """Build or update the database at output_path.
+
+    An existing database is updated in place: pages whose sitemap lastmod
+    matches the stored one are not downloaded again. ``force`` deletes it
+    first and re-scrapes everything (needed after changing the extraction);
+    a database with an out-of-date schema version is treated the same way.
+    """
+    if output_path.exists() and not force:
+        conn = sqlite3.connect(output_path)
+        try:
+            check_schema(conn, output_path)
+        except sqlite3.DatabaseError:
+            # Generated columns and FTS tables cannot be added in place
+            print(f"{output_path} was built with an older schema; rebuilding it from scratch")
+            force = True
+        finally:
+            conn.close()
+
+    if force and output_path.exists():
         output_path.unlink()
         print(f"Removed existing database: {output_path}")
 
-    # Initialize schema
+    # Initialize schema (a no-op for tables that already exist)
     print(f"Initializing database: {output_path}")
     conn = init_db(output_path)
     conn.close()
 
-    # Scrape framework docs from the website
-    fw_stats = await scrape_framework(output_path)
-
-    # Scrape nodes docs - try website first, fall back to GitHub markdown
+    # Scrape both sites concurrently. They hit different hosts, so the fetches
+    # overlap; their inserts share one connection on this event loop and so
+    # never contend for the SQLite write lock. Each scraper commits that
+    # shared connection when it finishes, which also commits the other's
+    # pages so far. That is safe because a page and all its rows are written
+    # between two awaits, so a commit never holds half a page.
+    # The FTS indexes are built once after the scrape instead of row by row.
+    conn = get_writable_connection(output_path)
     try:
-        nodes_stats = await scrape_nodes(output_path)
-        if nodes_stats["errors"] > nodes_stats["pages"]:
-            print("[build] Too many errors from website, falling back to GitHub source...")
-            nodes_stats = await scrape_nodes_github(output_path)
-    except Exception as e:
-        print(f"[build] Website scrape failed ({e}), falling back to GitHub source...")
-        nodes_stats = await scrape_nodes_github(output_path)
+        drop_fts_triggers(conn)
+        tasks = [
+            asyncio.create_task(scrape_framework(conn)),
+            asyncio.create_task(scrape_nodes_with_fallback(conn)),
+        ]
+        try:
+            fw_stats, nodes_stats = await asyncio.gather(*tasks)
+            if compressed := compress_stored_html(conn):
+                print(f"Compressed stored HTML of {compressed} pages")
+        except BaseException:
+            # gather() leaves the other scraper running; stop it before
+            # touching the connection it writes to
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Drop a half-finished scrape; what earlier commits stored stays
+            conn.rollback()
+            raise
+        finally:
+            # The file is kept and updated in place, so the triggers must come
+            # back even when the scrape fails
+            print("Building full-text search indexes...")
+            rebuild_fts(conn)
+        optimize_db(conn)
+        # Totals come from the database, which also holds the unchanged pages
+        total_pages, total_sections, total_examples, total_nodes = (
+            conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("pages", "sections", "code_examples", "nodes")
+        )
+    finally:
+        conn.close()
 
     # Print summary
-    total_pages = fw_stats["pages"] + nodes_stats["pages"]
-    total_sections = fw_stats["sections"] + nodes_stats["sections"]
-    total_examples = fw_stats["code_examples"] + nodes_stats["code_examples"]
+    total_fetched = fw_stats["pages"] + nodes_stats["pages"]
+    total_unchanged = fw_stats["unchanged"] + nodes_stats.get("unchanged", 0)
     total_errors = fw_stats["errors"] + nodes_stats["errors"]
 
     print("\n" + "=" * 60)
     print("BUILD COMPLETE")
     print("=" * 60)
     print(f"  Total pages:         {total_pages}")
+    print(f"    fetched:           {total_fetched}")
+    print(f"    unchanged:         {total_unchanged}")
     print(f"  Total sections:      {total_sections}")
     print(f"  Total code examples: {total_examples}")
-    print(f"  Total nodes:         {nodes_stats.get('nodes', 0)}")
+    print(f"  Total nodes:         {total_nodes}")
     print(f"  Total errors:        {total_errors}")
     print(f"  Database size:       {output_path.stat().st_size / 1024 / 1024:.1f} MB")
     print(f"  Output:              {output_path}")
@@ -66,7 +135,18 @@ async def build(output_path: Path):
     return total_errors == 0
 
 
+async def main(output_path: Path, force: bool = False) -> bool:
+    try:
+        return await build(output_path, force)
+    finally:
+        await close_client()
+        close_executor()
+
+
 if __name__ == "__main__":
-    output = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("griptape.db")
-    success = asyncio.run(build(output))
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("output", nargs="?", type=Path, default=Path("griptape.db"), help="database to build or update")
+    parser.add_argument("--force", action="store_true", help="delete the existing database and re-scrape every page")
+    args = parser.parse_args()
+    success = asyncio.run(main(args.output, args.force))
     sys.exit(0 if success else 1)
@@ -1,100 +1,408 @@
 """Shared scraping utilities for MkDocs documentation sites."""
 
 import asyncio
+import io
+import json
 import random
 import re
-import defusedxml.ElementTree as ET
+import sqlite3
+import sys
+import time
+import zlib
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
 import httpx
-from bs4 import BeautifulSoup, Tag
+import lxml.html
+from lxml import etree
+
+# Add parent dir so the scrapers can import the package when run standalone
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
 
 USER_AGENT = "griptape-mcp-scraper/0.1 (+https://github.com/KianBrose/griptape-mcp)"
-DEFAULT_MAX_CONCURRENT = 3
-DEFAULT_REQUEST_DELAY = 1.0  # seconds between requests
+DEFAULT_MAX_CONCURRENT = 10
+DEFAULT_REQUESTS_PER_SECOND = 5.0  # shared across all concurrent requests
 MAX_RETRIES = 5
 MAX_RESPONSE_SIZE = 10_000_000  # 10 MB - no legitimate docs page should exceed this
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+HTTP_CACHE_PATH = Path(__file__).resolve().parent / ".http_cache.db"
+# Each scraper awaits one parse at a time, and build_db runs two scrapers
+# (framework and nodes), so more workers than this would sit idle
+PARSE_WORKERS = 2
+
+_client: httpx.AsyncClient | None = None
+_executor: ProcessPoolExecutor | None = None
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """Revalidate GET responses against an on-disk cache keyed by URL.
+
+    Successful responses that carry an ETag or Last-Modified header are stored
+    (raw, still content-encoded bytes plus headers) in a small SQLite file. The
+    next request for the same URL sends If-None-Match / If-Modified-Since, and a
+    304 is answered from the cache as the original 200, so callers never see
+    the difference. Unchanged pages then cost a header round-trip, not a body.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, cache_path: Path = HTTP_CACHE_PATH):
+        self._transport = transport
+        self._db = sqlite3.connect(str(cache_path), isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, headers TEXT NOT NULL, body BLOB NOT NULL)"
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return await self._transport.handle_async_request(request)
+
+        url = str(request.url)
+        cached = self._db.execute(
+            "SELECT etag, last_modified, headers, body FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+        if cached:
+            etag, last_modified, _, _ = cached
+            if etag:
+                request.headers["If-None-Match"] = etag
+            if last_modified:
+                request.headers["If-Modified-Since"] = last_modified
+
+        response = await self._transport.handle_async_request(request)
+
+        if response.status_code == 304 and cached:
+            await response.aclose()
+            return self._build_response(request, 200, json.loads(cached[2]), cached[3], response.extensions)
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or not (etag or last_modified):
+            return response
+
+        try:
+            body = b"".join([chunk async for chunk in response.stream])
+        finally:
+            await response.aclose()
+        headers = response.headers.multi_items()
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (url, etag, last_modified, headers, body) VALUES (?, ?, ?, ?, ?)",
+            (url, etag, last_modified, json.dumps(headers), body),
+        )
+        return self._build_response(request, 200, headers, body, response.extensions)
+
+    @staticmethod
+    def _build_response(
+        request: httpx.Request, status_code: int, headers: list, body: bytes, extensions: dict
+    ) -> httpx.Response:
+        return httpx.Response(
+            status_code,
+            headers=headers,
+            stream=httpx.ByteStream(body),
+            request=request,
+            extensions=extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+        self._db.close()
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared HTTP/2 client, creating it on first use.
+
+    One keep-alive pool serves every sitemap, page and GitHub request of a
+    build, so each host pays for its TCP/TLS handshake once. Responses are
+    revalidated against the on-disk cache at HTTP_CACHE_PATH.
+    """
+    global _client
+    if _client is None:
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=DEFAULT_MAX_CONCURRENT * 2,
+                max_keepalive_connections=DEFAULT_MAX_CONCURRENT * 2,
+            ),
+        )
+        _client = httpx.AsyncClient(
+            transport=CachingTransport(transport),
+            follow_redirects=True,
+            timeout=httpx.Timeout(30.0, connect=10.0),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client, if one was created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return the shared process pool for HTML extraction, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    return _executor
+
+
+def close_executor() -> None:
+    """Shut down the shared process pool, if one was created."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
+class AsyncRateLimiter:
+    """Space request starts at most ``rate`` per second across concurrent tasks.
+
+    Each caller reserves the next free slot under a lock and then sleeps until
+    it outside the lock, so waiting never holds up a connection or a worker
+    that already has its slot.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._next_slot - now)
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait:
+            await asyncio.sleep(wait)
+
+
+def compress_html(html: str) -> bytes:
+    """Compress HTML for the ``pages.content_html`` BLOB column."""
+    return zlib.compress(html.encode("utf-8"))
+
+
+def compress_stored_html(conn: sqlite3.Connection) -> int:
+    """Compress ``content_html`` values still stored as plain text.
+
+    Databases built before compression keep their unchanged pages across
+    incremental builds, so their HTML would otherwise never be compressed.
+    Returns the number of pages rewritten.
+    """
+    rows = conn.execute(
+        "SELECT id, content_html FROM pages WHERE typeof(content_html) = 'text' AND content_html != ''"
+    ).fetchall()
+    conn.executemany(
+        "UPDATE pages SET content_html = ? WHERE id = ?",
+        [(compress_html(html), page_id) for page_id, html in rows],
+    )
+    return len(rows)
+
+
+def select_changed_urls(conn: sqlite3.Connection, source: str, urls: list[str], lastmod_map: dict) -> list[str]:
+    """Return the URLs that need fetching: new pages and pages whose lastmod moved.
+
+    A stored page is skipped only when the sitemap gives a lastmod equal to the
+    one stored with it. Stored pages of ``source`` that are no longer in ``urls``
+    are deleted along with their nodes.
+    """
+    stored = dict(conn.execute("SELECT url, last_modified FROM pages WHERE source = ?", (source,)))
+    wanted = set(urls)
+    gone = [(url,) for url in stored if url not in wanted]
+    # An empty sitemap is more likely a glitch than a site with no pages
+    if gone and urls:
+        conn.executemany("DELETE FROM nodes WHERE page_id = (SELECT id FROM pages WHERE url = ?)", gone)
+        conn.executemany("DELETE FROM pages WHERE url = ?", gone)
+    return [url for url in urls if not (lastmod_map.get(url) and stored.get(url) == lastmod_map[url])]
+
+
+def delete_page_nodes(conn: sqlite3.Connection, url: str) -> None:
+    """Delete the nodes of a stored page that is about to be replaced.
+
+    INSERT OR REPLACE cascades to sections and code examples, but nodes only
+    get their page_id nulled and would otherwise be duplicated.
+    """
+    conn.execute("DELETE FROM nodes WHERE page_id = (SELECT id FROM pages WHERE url = ?)", (url,))
+
+
+def insert_page_children(conn: sqlite3.Connection, page_id: int, sections: list[dict], code_examples: list[dict]) -> None:
+    """Batch-insert a page's sections and code examples.
+
+    Code examples are linked to the first section whose heading matches their
+    context. The page's heading -> section id map is read back once (served
+    from idx_sections_page_heading) rather than queried per code example.
+    """
+    conn.executemany(
+        "INSERT INTO sections (page_id, heading, level, content, anchor) VALUES (?, ?, ?, ?, ?)",
+        [(page_id, s["heading"], s["level"], s["content"], s["anchor"]) for s in sections],
+    )
+
+    section_ids: dict[str, int] = {}
+    if sections and code_examples:
+        section_ids = dict(conn.execute(
+            "SELECT heading, MIN(id) FROM sections WHERE page_id = ? GROUP BY heading", (page_id,)
+        ))
+
+    conn.executemany(
+        "INSERT INTO code_examples (page_id, section_id, language, code, context) VALUES (?, ?, ?, ?, ?)",
+        [
+            (page_id, section_ids.get(ex["context"]) if ex.get("context") else None, ex["language"], ex["code"], ex["context"])
+            for ex in code_examples
+        ],
+    )
 
 
 async def fetch_sitemap(url: str) -> list[dict]:
     """Fetch and parse a sitemap.xml, returning list of {url, lastmod}."""
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        for attempt in range(MAX_RETRIES):
-            resp = await client.get(url, headers={"User-Agent": USER_AGENT})
-            if resp.status_code == 429:
-                wait = 10 * (attempt + 1)  # 10s, 20s, 30s, 40s, 50s
-                print(f"  [429] Sitemap rate limited, waiting {wait}s (attempt {attempt + 1}/{MAX_RETRIES})")
-                await asyncio.sleep(wait)
-                continue
-            resp.raise_for_status()
-            break
-        else:
-            resp.raise_for_status()  # Raise on final failure
-
-    root = ET.fromstring(resp.text)
-    ns = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+    client = get_client()
+    for attempt in range(MAX_RETRIES):
+        resp = await client.get(url, headers={"User-Agent": USER_AGENT})
+        if resp.status_code == 429:
+            wait = 10 * (attempt + 1)  # 10s, 20s, 30s, 40s, 50s
+            print(f"  [429] Sitemap rate limited, waiting {wait}s (attempt {attempt + 1}/{MAX_RETRIES})")
+            await asyncio.sleep(wait)
+            continue
+        resp.raise_for_status()
+        break
+    else:
+        resp.raise_for_status()  # Raise on final failure
 
+    # Stream <url> elements, freeing each (and its already-seen siblings) once read.
+    # Entities are never expanded and no DTDs fetched, as with defusedxml.
     entries = []
-    for url_elem in root.findall("sm:url", ns):
-        loc = url_elem.find("sm:loc", ns)
-        lastmod = url_elem.find("sm:lastmod", ns)
-        if loc is not None and loc.text:
+    for _, url_elem in etree.iterparse(
+        io.BytesIO(resp.content),
+        tag=f"{SITEMAP_NS}url",
+        resolve_entities=False,
+        no_network=True,
+        load_dtd=False,
+    ):
+        loc = url_elem.findtext(f"{SITEMAP_NS}loc")
+        lastmod = url_elem.findtext(f"{SITEMAP_NS}lastmod")
+        if loc:
             entries.append({
-                "url": loc.text.strip(),
-                "lastmod": lastmod.text.strip() if lastmod is not None and lastmod.text else None,
+                "url": loc.strip(),
+                "lastmod": lastmod.strip() if lastmod else None,
             })
+        url_elem.clear()
+        while url_elem.getprevious() is not None:
+            del url_elem.getparent()[0]
 
     return entries
 
 
-async def fetch_pages(
+async def fetch_one(client: httpx.AsyncClient, url: str, limiter: AsyncRateLimiter) -> dict:
+    """Fetch a single page, retrying on 429. Never raises; failures land in ``error``."""
+    for attempt in range(MAX_RETRIES):
+        try:
+            await limiter.acquire()
+            resp = await client.get(url, headers={"User-Agent": USER_AGENT})
+            if resp.status_code == 429:
+                wait = 10 * (attempt + 1) + random.uniform(0, 5)
+                print(f"  [429] Rate limited, waiting {wait:.0f}s (attempt {attempt + 1}/{MAX_RETRIES})")
+                await asyncio.sleep(wait)
+                continue
+            resp.raise_for_status()
+            content_length = int(resp.headers.get("content-length", 0))
+            if content_length > MAX_RESPONSE_SIZE:
+                return {"url": url, "html": None, "error": f"Response too large ({content_length} bytes)"}
+            text = resp.text
+            if len(text) > MAX_RESPONSE_SIZE:
+                return {"url": url, "html": None, "error": f"Response too large ({len(text)} bytes)"}
+            return {"url": url, "html": text, "error": None}
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 429 and attempt < MAX_RETRIES - 1:
+                wait = 10 * (attempt + 1) + random.uniform(0, 5)
+                print(f"  [429] Rate limited, waiting {wait:.0f}s (attempt {attempt + 1}/{MAX_RETRIES})")
+                await asyncio.sleep(wait)
+                continue
+            return {"url": url, "html": None, "error": str(e)}
+        except Exception as e:
+            return {"url": url, "html": None, "error": str(e)}
+    return {"url": url, "html": None, "error": "Max retries exceeded (429)"}
+
+
+async def iter_pages(
     urls: list[str],
     max_concurrent: int = DEFAULT_MAX_CONCURRENT,
-    request_delay: float = DEFAULT_REQUEST_DELAY,
-) -> list[dict]:
-    """Async fetch multiple pages with rate limiting and retry on 429.
+    requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+) -> AsyncIterator[dict]:
+    """Async fetch multiple pages, yielding each one as soon as it arrives.
+
+    ``max_concurrent`` workers pull URLs from a shared iterator and push results
+    into a bounded queue, so only a handful of pages are held in memory and the
+    caller can parse and store one page while the next ones download. Pages are
+    yielded in completion order, not in ``urls`` order.
 
     Args:
         urls: List of URLs to fetch.
-        max_concurrent: Max simultaneous requests (lower = gentler on the server).
-        request_delay: Seconds to wait between successful requests.
+        max_concurrent: Max simultaneous requests in flight.
+        requests_per_second: Max request rate across all workers (lower = gentler
+            on the server).
     """
-    semaphore = asyncio.Semaphore(max_concurrent)
-
-    async def fetch_one(client: httpx.AsyncClient, url: str) -> dict:
-        async with semaphore:
-            for attempt in range(MAX_RETRIES):
-                try:
-                    resp = await client.get(url, headers={"User-Agent": USER_AGENT})
-                    if resp.status_code == 429:
-                        wait = 10 * (attempt + 1) + random.uniform(0, 5)
-                        print(f"  [429] Rate limited, waiting {wait:.0f}s (attempt {attempt + 1}/{MAX_RETRIES})")
-                        await asyncio.sleep(wait)
-                        continue
-                    resp.raise_for_status()
-                    content_length = int(resp.headers.get("content-length", 0))
-                    if content_length > MAX_RESPONSE_SIZE:
-                        return {"url": url, "html": None, "error": f"Response too large ({content_length} bytes)"}
-                    text = resp.text
-                    if len(text) > MAX_RESPONSE_SIZE:
-                        return {"url": url, "html": None, "error": f"Response too large ({len(text)} bytes)"}
-                    await asyncio.sleep(request_delay)
-                    return {"url": url, "html": text, "error": None}
-                except httpx.HTTPStatusError as e:
-                    if e.response.status_code == 429 and attempt < MAX_RETRIES - 1:
-                        wait = 10 * (attempt + 1) + random.uniform(0, 5)
-                        print(f"  [429] Rate limited, waiting {wait:.0f}s (attempt {attempt + 1}/{MAX_RETRIES})")
-                        await asyncio.sleep(wait)
-                        continue
-                    return {"url": url, "html": None, "error": str(e)}
-                except Exception as e:
-                    return {"url": url, "html": None, "error": str(e)}
-            return {"url": url, "html": None, "error": "Max retries exceeded (429)"}
-
-    async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
-        tasks = [fetch_one(client, url) for url in urls]
-        results = await asyncio.gather(*tasks)
-
-    return list(results)
+    queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=max_concurrent * 2)
+    pending = iter(urls)
+    limiter = AsyncRateLimiter(requests_per_second)
+
+    client = get_client()
+
+    async def worker() -> None:
+        for url in pending:
+            await queue.put(await fetch_one(client, url, limiter))
+
+    workers = [asyncio.create_task(worker()) for _ in range(max_concurrent)]
+    try:
+        # fetch_one never raises, so every URL produces exactly one result
+        for _ in range(len(urls)):
+            yield await queue.get()
+    finally:
+        for task in workers:
+            task.cancel()
+
+
+def _class_xpath(cls: str) -> str:
+    """XPath predicate matching elements whose class list contains ``cls``."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+
+
+# Compiled once at import; evaluation runs entirely inside libxml2.
+# Tried in priority order (not document order) to match the preferred container.
+CONTENT_XPS = [
+    etree.XPath(f"(//*[{_class_xpath('md-content__inner')}])[1]"),
+    etree.XPath(f"(//*[{_class_xpath('md-content')}])[1]"),
+    etree.XPath("(//article)[1]"),
+]
+BREADCRUMB_XPS = [
+    etree.XPath(f"(//*[{_class_xpath('md-breadcrumb')}])[1]"),
+    etree.XPath("(//nav[@aria-label='Breadcrumb'])[1]"),
+]
+HEADINGS_XP = etree.XPath(".//h2|.//h3|.//h4")
+PRES_XP = etree.XPath(".//pre")
+# Nearest preceding paragraph/heading in document order, ancestors included.
+CODE_CONTEXT_XP = etree.XPath(
+    "(ancestor::p|ancestor::h2|ancestor::h3|ancestor::h4"
+    "|preceding::p|preceding::h2|preceding::h3|preceding::h4)[last()]"
+)
+# Elements whose bodies are not page text (BeautifulSoup's get_text() skipped them too)
+NON_TEXT_TAGS = ("script", "style", "template")
+SECTION_BREAK_TAGS = frozenset(("h1", "h2", "h3", "h4"))
+HIGHLIGHT_CLASS_PATTERN = re.compile(r"highlight-(\w+)")
+
+
+def _first(xpaths: list[etree.XPath], root: lxml.html.HtmlElement) -> lxml.html.HtmlElement | None:
+    """Return the first match from the first XPath that finds anything."""
+    for xp in xpaths:
+        found = xp(root)
+        if found:
+            return found[0]
+    return None
+
+
+def _text(el: lxml.html.HtmlElement, separator: str = "") -> str:
+    """Join the stripped, non-empty text nodes under ``el``."""
+    return separator.join(s for s in map(str.strip, el.itertext()) if s)
 
 
 def extract_mkdocs_content(html: str) -> dict:
@@ -109,18 +417,34 @@ def extract_mkdocs_content(html: str) -> dict:
             "sections": list[{heading, level, content, anchor}],
             "code_examples": list[{language, code, context}],
         }
+
+    Raises:
+        ValueError: if ``html`` does not start with a tag.
     """
-    soup = BeautifulSoup(html, "lxml")
+    # Fail fast on bodies that are not HTML (e.g. raw markdown): the parser would
+    # wrap them in a synthetic <p> and hand back a page with no content.
+    if not html.lstrip().startswith("<"):
+        raise ValueError(f"Expected an HTML document, got: {html[:40]!r}")
 
-    # Title
-    h1 = soup.find("h1")
-    title = h1.get_text(strip=True) if h1 else ""
+    root = lxml.html.fromstring(html)
+    # Serialize the content area before dropping script/style/template bodies, so
+    # every text walk below can be a plain itertext().
+    content_el = _first(CONTENT_XPS, root)
+    content_html = (
+        etree.tostring(content_el, encoding="unicode", method="html", with_tail=False)
+        if content_el is not None
+        else ""
+    )
+    etree.strip_elements(root, *NON_TEXT_TAGS, with_tail=False)
+
+    # Title (find() stops at the first match)
+    h1 = root.find(".//h1")
+    title = _text(h1) if h1 is not None else ""
     # Remove trailing anchor character (¶) that MkDocs adds
     title = title.rstrip("¶").strip()
 
     # Main content area
-    content_el = soup.select_one(".md-content__inner") or soup.select_one(".md-content") or soup.select_one("article")
-    if not content_el:
+    if content_el is None:
         return {
             "title": title,
             "content_text": "",
@@ -130,28 +454,29 @@ def extract_mkdocs_content(html: str) -> dict:
             "code_examples": [],
         }
 
-    content_html = str(content_el)
-    content_text = content_el.get_text(separator="\n", strip=True)
+    content_text = _text(content_el, "\n")
 
     # Breadcrumbs
     breadcrumbs = []
-    crumb_nav = soup.select_one(".md-breadcrumb") or soup.select_one("nav[aria-label='Breadcrumb']")
-    if crumb_nav:
-        breadcrumbs = [a.get_text(strip=True) for a in crumb_nav.find_all("a")]
+    crumb_nav = _first(BREADCRUMB_XPS, root)
+    if crumb_nav is not None:
+        breadcrumbs = [_text(a) for a in crumb_nav.iter("a")]
 
     # Sections (h2, h3, h4)
     sections = []
-    for heading in content_el.find_all(["h2", "h3", "h4"]):
-        level = int(heading.name[1])
-        heading_text = heading.get_text(strip=True).rstrip("¶").strip()
+    for heading in HEADINGS_XP(content_el):
+        level = int(heading.tag[1])
+        heading_text = _text(heading).rstrip("¶").strip()
         anchor = heading.get("id", "")
 
         # Collect text between this heading and the next
         section_parts = []
-        for sibling in heading.find_next_siblings():
-            if isinstance(sibling, Tag) and sibling.name in ("h1", "h2", "h3", "h4"):
+        for sibling in heading.itersiblings():
+            if not isinstance(sibling.tag, str):
+                continue  # comments / processing instructions
+            if sibling.tag in SECTION_BREAK_TAGS:
                 break
-            section_parts.append(sibling.get_text(separator="\n", strip=True))
+            section_parts.append(_text(sibling, "\n"))
 
         sections.append({
             "heading": heading_text,
@@ -162,33 +487,33 @@ def extract_mkdocs_content(html: str) -> dict:
 
     # Code examples
     code_examples = []
-    for pre in content_el.find_all("pre"):
-        code_el = pre.find("code")
-        if not code_el:
+    for pre in PRES_XP(content_el):
+        code_el = pre.find(".//code")
+        if code_el is None:
             continue
 
-        code_text = code_el.get_text()
+        code_text = "".join(code_el.itertext())
         if not code_text.strip():
             continue
 
         # Detect language from class
         language = "text"
-        classes = code_el.get("class", [])
+        classes = code_el.get("class", "").split()
         for cls in classes:
             if cls.startswith("language-"):
                 language = cls.replace("language-", "")
                 break
             # Also check for highlight classes
-            match = re.match(r"highlight-(\w+)", cls)
+            match = HIGHLIGHT_CLASS_PATTERN.match(cls)
             if match:
                 language = match.group(1)
                 break
 
         # Get surrounding context (previous paragraph or heading)
         context = ""
-        prev = pre.find_previous(["p", "h2", "h3", "h4"])
+        prev = CODE_CONTEXT_XP(pre)
         if prev:
-            context = prev.get_text(strip=True).rstrip("¶").strip()
+            context = _text(prev[0]).rstrip("¶").strip()
 
         code_examples.append({
             "language": language,
@@ -204,3 +529,13 @@ def extract_mkdocs_content(html: str) -> dict:
         "sections": sections,
         "code_examples": code_examples,
     }
+
+
+async def parse_page(html: str) -> dict:
+    """Run extract_mkdocs_content in the process pool, off the event loop.
+
+    The fetch workers keep downloading while a page parses, and concurrent
+    scrapers parse on separate cores. Raises the same ValueError as extract_mkdocs_content.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), extract_mkdocs_content, html)
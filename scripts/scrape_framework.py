@@ -1,12 +1,24 @@
 """Scrape Griptape Framework documentation from docs.griptape.ai."""
 
 import asyncio
-import json
 import sqlite3
 import sys
 from pathlib import Path
 
-from scrape_common import extract_mkdocs_content, fetch_pages, fetch_sitemap
+import orjson
+
+from scrape_common import (
+    compress_html,
+    delete_page_nodes,
+    fetch_sitemap,
+    insert_page_children,
+    iter_pages,
+    parse_page,
+    select_changed_urls,
+)
+
+# Imported after scrape_common, which puts src/ on sys.path
+from griptape_mcp.db import get_writable_connection
 
 SITEMAP_URL = "https://docs.griptape.ai/stable/sitemap.xml"
 SOURCE = "framework"
@@ -19,8 +31,11 @@ def should_skip(url: str) -> bool:
     return any(pattern in url for pattern in SKIP_PATTERNS)
 
 
-async def scrape(db_path: Path) -> dict:
-    """Scrape the Griptape Framework docs into the given SQLite database.
+async def scrape(conn: sqlite3.Connection) -> dict:
+    """Scrape the Griptape Framework docs into the given SQLite connection.
+
+    Commits when done; the caller owns (and closes) the connection, so
+    several scrapers can share it concurrently on one event loop.
 
     Returns stats dict with counts.
     """
@@ -31,26 +46,33 @@ async def scrape(db_path: Path) -> dict:
 
     print(f"[framework] Found {len(urls)} pages to scrape (filtered from {len(entries)} sitemap entries)")
 
-    print("[framework] Fetching pages...")
-    pages = await fetch_pages(urls)
-
-    conn = sqlite3.connect(str(db_path))
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
+    # Pages already stored with the same lastmod are kept as they are
+    changed = select_changed_urls(conn, SOURCE, urls, lastmod_map)
+    unchanged = len(urls) - len(changed)
+    urls = changed
+    if unchanged:
+        print(f"[framework] Skipping {unchanged} pages unchanged since the last build")
 
-    stats = {"pages": 0, "sections": 0, "code_examples": 0, "errors": 0}
+    print("[framework] Fetching pages...")
+    stats = {"pages": 0, "sections": 0, "code_examples": 0, "unchanged": unchanged, "errors": 0}
 
-    for page in pages:
+    async for page in iter_pages(urls):
         if page["error"]:
             print(f"  [ERROR] {page['url']}: {page['error']}")
             stats["errors"] += 1
             continue
 
-        data = extract_mkdocs_content(page["html"])
+        try:
+            data = await parse_page(page.pop("html"))
+        except ValueError as e:
+            print(f"  [ERROR] {page['url']}: {e}")
+            stats["errors"] += 1
+            continue
         if not data["title"]:
             continue
 
         try:
+            delete_page_nodes(conn, page["url"])
             cursor = conn.execute(
                 """
                 INSERT OR REPLACE INTO pages (url, source, title, content, content_html, breadcrumbs, last_modified)
@@ -61,43 +83,22 @@ async def scrape(db_path: Path) -> dict:
                     SOURCE,
                     data["title"],
                     data["content_text"],
-                    data["content_html"],
-                    json.dumps(data["breadcrumbs"]),
+                    compress_html(data["content_html"]),
+                    orjson.dumps(data["breadcrumbs"]).decode(),
                     lastmod_map.get(page["url"]),
                 ),
             )
             page_id = cursor.lastrowid
             stats["pages"] += 1
 
-            for section in data["sections"]:
-                conn.execute(
-                    "INSERT INTO sections (page_id, heading, level, content, anchor) VALUES (?, ?, ?, ?, ?)",
-                    (page_id, section["heading"], section["level"], section["content"], section["anchor"]),
-                )
-                stats["sections"] += 1
-
-            for ex in data["code_examples"]:
-                # Find the section this code example belongs to
-                section_id = None
-                if ex.get("context"):
-                    row = conn.execute(
-                        "SELECT id FROM sections WHERE page_id = ? AND heading = ? LIMIT 1",
-                        (page_id, ex["context"]),
-                    ).fetchone()
-                    if row:
-                        section_id = row[0]
-
-                conn.execute(
-                    "INSERT INTO code_examples (page_id, section_id, language, code, context) VALUES (?, ?, ?, ?, ?)",
-                    (page_id, section_id, ex["language"], ex["code"], ex["context"]),
-                )
-                stats["code_examples"] += 1
+            insert_page_children(conn, page_id, data["sections"], data["code_examples"])
+            stats["sections"] += len(data["sections"])
+            stats["code_examples"] += len(data["code_examples"])
 
         except sqlite3.IntegrityError as e:
             print(f"  [SKIP] {page['url']}: {e}")
 
     conn.commit()
-    conn.close()
 
     print(f"[framework] Done: {stats['pages']} pages, {stats['sections']} sections, {stats['code_examples']} code examples, {stats['errors']} errors")
     return stats
@@ -105,4 +106,6 @@ async def scrape(db_path: Path) -> dict:
 
 if __name__ == "__main__":
     db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("griptape.db")
-    asyncio.run(scrape(db_path))
+    conn = get_writable_connection(db_path)
+    asyncio.run(scrape(conn))
+    conn.close()
@@ -1,13 +1,25 @@
 """Scrape Griptape Nodes documentation from docs.griptapenodes.com."""
 
 import asyncio
-import json
 import re
 import sqlite3
 import sys
 from pathlib import Path
 
-from scrape_common import extract_mkdocs_content, fetch_pages, fetch_sitemap
+import orjson
+
+from scrape_common import (
+    compress_html,
+    delete_page_nodes,
+    fetch_sitemap,
+    insert_page_children,
+    iter_pages,
+    parse_page,
+    select_changed_urls,
+)
+
+# Imported after scrape_common, which puts src/ on sys.path
+from griptape_mcp.db import get_writable_connection
 
 SITEMAP_URL = "https://docs.griptapenodes.com/en/stable/sitemap.xml"
 BASE_URL = "https://docs.griptapenodes.com"
@@ -20,6 +32,9 @@ SKIP_PATTERNS = ["/search.html", "/404.html"]
 # Node documentation pages live under /nodes/
 NODE_URL_PATTERN = re.compile(r"/nodes/(\w+)/(\w+)/?$")
 
+# Path component of a sitemap URL: drops scheme, host, query and fragment
+URL_PATH_PATTERN = re.compile(r"^(?:[A-Za-z][\w+.-]*:)?(?://[^/?#]*)?([^?#]*)")
+
 # Map URL path segments to display categories
 CATEGORY_MAP = {
     "agents": "Agents",
@@ -46,6 +61,14 @@ def should_skip(url: str) -> bool:
     return any(pattern in url for pattern in SKIP_PATTERNS)
 
 
+def normalize_url(url: str) -> str:
+    """Rebase a sitemap URL onto BASE_URL; the sitemap may omit the /en/stable/ prefix."""
+    path = URL_PATH_PATTERN.match(url).group(1)
+    if not path.startswith(STABLE_PREFIX):
+        path = STABLE_PREFIX + path.lstrip("/")
+    return f"{BASE_URL}{path}"
+
+
 def extract_node_info(url: str, title: str) -> dict | None:
     """If this URL is a node documentation page, extract structured info."""
     match = NODE_URL_PATTERN.search(url)
@@ -62,23 +85,17 @@ def extract_node_info(url: str, title: str) -> dict | None:
     }
 
 
-async def scrape(db_path: Path) -> dict:
-    """Scrape the Griptape Nodes docs into the given SQLite database.
+async def scrape(conn: sqlite3.Connection) -> dict:
+    """Scrape the Griptape Nodes docs into the given SQLite connection.
+
+    Commits when done; the caller owns (and closes) the connection, so
+    several scrapers can share it concurrently on one event loop.
 
     Returns stats dict with counts.
     """
     print(f"[nodes] Fetching sitemap: {SITEMAP_URL}")
     entries = await fetch_sitemap(SITEMAP_URL)
 
-    # Normalize URLs: sitemap may return URLs without /en/stable/ prefix
-    def normalize_url(url: str) -> str:
-        from urllib.parse import urlparse
-        parsed = urlparse(url)
-        path = parsed.path
-        if not path.startswith(STABLE_PREFIX):
-            path = STABLE_PREFIX + path.lstrip("/")
-        return f"{BASE_URL}{path}"
-
     urls = [normalize_url(e["url"]) for e in entries if not should_skip(e["url"])]
     # Deduplicate while preserving order
     urls = list(dict.fromkeys(urls))
@@ -86,26 +103,33 @@ async def scrape(db_path: Path) -> dict:
 
     print(f"[nodes] Found {len(urls)} pages to scrape (filtered from {len(entries)} sitemap entries)")
 
-    print("[nodes] Fetching pages...")
-    pages = await fetch_pages(urls, max_concurrent=1, request_delay=2.0)
+    # Pages already stored with the same lastmod are kept as they are
+    changed = select_changed_urls(conn, SOURCE, urls, lastmod_map)
+    unchanged = len(urls) - len(changed)
+    urls = changed
+    if unchanged:
+        print(f"[nodes] Skipping {unchanged} pages unchanged since the last build")
 
-    conn = sqlite3.connect(str(db_path))
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
-
-    stats = {"pages": 0, "sections": 0, "code_examples": 0, "nodes": 0, "errors": 0}
+    print("[nodes] Fetching pages...")
+    stats = {"pages": 0, "sections": 0, "code_examples": 0, "unchanged": unchanged, "nodes": 0, "errors": 0}
 
-    for page in pages:
+    async for page in iter_pages(urls, max_concurrent=1, requests_per_second=0.5):
         if page["error"]:
             print(f"  [ERROR] {page['url']}: {page['error']}")
             stats["errors"] += 1
             continue
 
-        data = extract_mkdocs_content(page["html"])
+        try:
+            data = await parse_page(page.pop("html"))
+        except ValueError as e:
+            print(f"  [ERROR] {page['url']}: {e}")
+            stats["errors"] += 1
+            continue
         if not data["title"]:
             continue
 
         try:
+            delete_page_nodes(conn, page["url"])
             cursor = conn.execute(
                 """
                 INSERT OR REPLACE INTO pages (url, source, title, content, content_html, breadcrumbs, last_modified)
@@ -116,40 +140,23 @@ async def scrape(db_path: Path) -> dict:
                     SOURCE,
                     data["title"],
                     data["content_text"],
-                    data["content_html"],
-                    json.dumps(data["breadcrumbs"]),
+                    compress_html(data["content_html"]),
+                    orjson.dumps(data["breadcrumbs"]).decode(),
                     lastmod_map.get(page["url"]),
                 ),
             )
             page_id = cursor.lastrowid
             stats["pages"] += 1
 
-            for section in data["sections"]:
-                conn.execute(
-                    "INSERT INTO sections (page_id, heading, level, content, anchor) VALUES (?, ?, ?, ?, ?)",
-                    (page_id, section["heading"], section["level"], section["content"], section["anchor"]),
-                )
-                stats["sections"] += 1
-
-            for ex in data["code_examples"]:
-                section_id = None
-                if ex.get("context"):
-                    row = conn.execute(
-                        "SELECT id FROM sections WHERE page_id = ? AND heading = ? LIMIT 1",
-                        (page_id, ex["context"]),
-                    ).fetchone()
-                    if row:
-                        section_id = row[0]
-
-                conn.execute(
-                    "INSERT INTO code_examples (page_id, section_id, language, code, context) VALUES (?, ?, ?, ?, ?)",
-                    (page_id, section_id, ex["language"], ex["code"], ex["context"]),
-                )
-                stats["code_examples"] += 1
+            insert_page_children(conn, page_id, data["sections"], data["code_examples"])
+            stats["sections"] += len(data["sections"])
+            stats["code_examples"] += len(data["code_examples"])
 
             # Extract node info if this is a node documentation page
             node_info = extract_node_info(page["url"], data["title"])
             if node_info:
+                # Stored with its page, before the next await: the framework
+                # scraper may commit this shared connection at any await point
                 conn.execute(
                     "INSERT INTO nodes (name, display_name, category, description, page_id) VALUES (?, ?, ?, ?, ?)",
                     (
@@ -166,7 +173,6 @@ async def scrape(db_path: Path) -> dict:
             print(f"  [SKIP] {page['url']}: {e}")
 
     conn.commit()
-    conn.close()
 
     print(
         f"[nodes] Done: {stats['pages']} pages, {stats['nodes']} nodes, "
@@ -178,4 +184,6 @@ async def scrape(db_path: Path) -> dict:
 
 if __name__ == "__main__":
     db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("griptape.db")
-    asyncio.run(scrape(db_path))
+    conn = get_writable_connection(db_path)
+    asyncio.run(scrape(conn))
+    conn.close()
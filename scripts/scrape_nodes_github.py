@@ -12,13 +12,22 @@ from pathlib import Path
 
 import httpx
 
+from scrape_common import AsyncRateLimiter, delete_page_nodes, get_client, insert_page_children
+
+# Imported after scrape_common, which puts src/ on sys.path
+from griptape_mcp.db import get_writable_connection
+
 USER_AGENT = "griptape-mcp-scraper/0.1"
 SOURCE = "nodes"
 BASE_DOCS_URL = "https://docs.griptapenodes.com/en/stable"
 
-# GitHub API for listing directory contents
-GITHUB_API = "https://api.github.com/repos/griptape-ai/griptape-nodes/contents/docs"
-GITHUB_RAW = "https://raw.githubusercontent.com/griptape-ai/griptape-nodes/main/docs"
+# GitHub API for listing the repository tree, and raw content for file bodies
+GITHUB_BRANCH = "main"
+GITHUB_API = "https://api.github.com/repos/griptape-ai/griptape-nodes"
+GITHUB_RAW = f"https://raw.githubusercontent.com/griptape-ai/griptape-nodes/{GITHUB_BRANCH}"
+# Raw file fetches: at most 5 in flight, starts spaced by a shared limiter
+GITHUB_MAX_CONCURRENT = 5
+GITHUB_REQUESTS_PER_SECOND = 10.0
 
 CATEGORY_MAP = {
     "agents": "Agents",
@@ -41,106 +50,116 @@ CATEGORY_MAP = {
     "workflows": "Workflows",
 }
 
+# One pass over the whole document: a fenced code block (```lang ... ```) or an
+# h1-h4 heading line. Each token swallows its trailing newline so the text
+# between tokens slices out exactly the prose lines.
+MARKDOWN_TOKEN_PATTERN = re.compile(
+    r"^(?P<fence>```)`*[ \t]*(?P<lang>[^\s`]*)[^\n]*(?:\n|\Z)(?P<code>.*?)\n?(?:^```[^\n]*(?:\n|\Z)|\Z)"
+    r"|^(?P<hashes>#{1,4})[ \t]+(?P<heading>[^\n]+)(?:\n|\Z)",
+    re.MULTILINE | re.DOTALL,
+)
+ANCHOR_STRIP_PATTERN = re.compile(r"[^\w\s-]")
+
 
 async def list_github_files(client: httpx.AsyncClient, path: str) -> list[dict]:
-    """Recursively list all .md files under a GitHub directory path."""
+    """List all .md files under a GitHub directory path.
+
+    Reads the whole repository tree in one git/trees?recursive=1 request
+    instead of walking the contents API directory by directory.
+    """
     files = []
     resp = await client.get(
-        f"https://api.github.com/repos/griptape-ai/griptape-nodes/contents/{path}",
+        f"{GITHUB_API}/git/trees/{GITHUB_BRANCH}",
+        params={"recursive": "1"},
         headers={"User-Agent": USER_AGENT, "Accept": "application/vnd.github.v3+json"},
     )
     if resp.status_code != 200:
         print(f"  [WARN] GitHub API {resp.status_code} for {path}")
         return files
 
-    for item in resp.json():
-        if item["type"] == "file" and item["name"].endswith(".md"):
+    tree = resp.json()
+    if tree.get("truncated"):
+        print(f"  [WARN] GitHub tree listing truncated; some files under {path} may be missing")
+
+    prefix = f"{path.rstrip('/')}/"
+    for item in tree["tree"]:
+        item_path = item["path"]
+        if item["type"] == "blob" and item_path.startswith(prefix) and item_path.endswith(".md"):
             files.append({
-                "path": item["path"],
-                "name": item["name"],
-                "download_url": item["download_url"],
+                "path": item_path,
+                "name": item_path.rsplit("/", 1)[-1],
+                "download_url": f"{GITHUB_RAW}/{item_path}",
             })
-        elif item["type"] == "dir":
-            sub = await list_github_files(client, item["path"])
-            files.extend(sub)
-            await asyncio.sleep(0.5)  # Be nice to GitHub API
 
     return files
 
 
 def parse_markdown(content: str) -> dict:
-    """Parse markdown content into structured sections and code examples."""
-    lines = content.split("\n")
+    """Parse markdown content into structured sections and code examples.
+
+    Works on the markdown source directly; it never goes through the HTML
+    extractor, and no HTML is rendered for these pages.
+
+    Returns:
+        {
+            "title": str,
+            "content_text": str,
+            "sections": list[{heading, level, content, anchor}],
+            "code_examples": list[{language, code, context}],
+        }
+    """
     title = ""
-    sections = []
-    code_examples = []
-    current_section = None
-    in_code_block = False
-    code_lang = ""
-    code_lines = []
-    text_parts = []
-
-    for line in lines:
-        # Code block detection
-        if line.startswith("```"):
-            if in_code_block:
-                # End of code block
-                code_text = "\n".join(code_lines)
-                if code_text.strip():
-                    context = ""
-                    if current_section:
-                        context = current_section["heading"]
-                    code_examples.append({
-                        "language": code_lang or "python",
-                        "code": code_text,
-                        "context": context,
-                    })
-                code_lines = []
-                in_code_block = False
-            else:
-                # Start of code block
-                in_code_block = True
-                code_lang = line.lstrip("`").strip().split()[0] if line.lstrip("`").strip() else "python"
+    sections: list[dict] = []
+    code_examples: list[dict] = []
+    current_section: dict | None = None
+    # Prose of the current section: the slices between tokens. Text before the
+    # first section is never stored, so it is not sliced out at all.
+    section_parts: list[str] = []
+    last_end = 0
+
+    for match in MARKDOWN_TOKEN_PATTERN.finditer(content):
+        if current_section is not None:
+            section_parts.append(content[last_end:match.start()])
+        last_end = match.end()
+
+        if match.group("fence") is not None:
+            code_text = match.group("code")
+            if code_text.strip():
+                code_examples.append({
+                    "language": match.group("lang") or "python",
+                    "code": code_text,
+                    "context": current_section["heading"] if current_section else "",
+                })
             continue
 
-        if in_code_block:
-            code_lines.append(line)
+        level = len(match.group("hashes"))
+        heading_text = match.group("heading").strip()
+
+        if level == 1 and not title:
+            title = heading_text
             continue
 
-        # Heading detection
-        heading_match = re.match(r"^(#{1,4})\s+(.+)", line)
-        if heading_match:
-            level = len(heading_match.group(1))
-            heading_text = heading_match.group(2).strip()
-
-            if level == 1 and not title:
-                title = heading_text
-                continue
-
-            # Save previous section
-            if current_section and text_parts:
-                current_section["content"] = "\n".join(text_parts).strip()
-
-            current_section = {
-                "heading": heading_text,
-                "level": level,
-                "content": "",
-                "anchor": re.sub(r"[^\w\s-]", "", heading_text.lower()).replace(" ", "-"),
-            }
-            sections.append(current_section)
-            text_parts = []
-        else:
-            text_parts.append(line)
+        # Save previous section
+        if current_section is not None:
+            current_section["content"] = "".join(section_parts).strip()
 
-    # Close last section
-    if current_section and text_parts:
-        current_section["content"] = "\n".join(text_parts).strip()
+        current_section = {
+            "heading": heading_text,
+            "level": level,
+            "content": "",
+            "anchor": ANCHOR_STRIP_PATTERN.sub("", heading_text.lower()).replace(" ", "-"),
+        }
+        sections.append(current_section)
+        section_parts = []
 
-    full_text = content
+    # Close last section
+    if current_section is not None:
+        section_parts.append(content[last_end:])
+        current_section["content"] = "".join(section_parts).strip()
 
     return {
         "title": title,
-        "content_text": full_text,
+        "content_text": content,
         "sections": sections,
         "code_examples": code_examples,
     }
@@ -175,40 +194,38 @@ def extract_node_info(file_path: str, title: str) -> dict | None:
     }
 
 
-async def scrape(db_path: Path) -> dict:
-    """Scrape Griptape Nodes docs from GitHub into the SQLite database."""
+async def scrape(conn: sqlite3.Connection) -> dict:
+    """Scrape Griptape Nodes docs from GitHub into the given SQLite connection.
+
+    Commits when done; the caller owns (and closes) the connection.
+    """
     print("[nodes-github] Listing documentation files from GitHub...")
 
-    async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
-        md_files = await list_github_files(client, "docs")
+    client = get_client()
+    md_files = await list_github_files(client, "docs")
 
     print(f"[nodes-github] Found {len(md_files)} markdown files")
 
     # Fetch all markdown content
     print("[nodes-github] Fetching markdown content...")
-    semaphore = asyncio.Semaphore(5)
+    semaphore = asyncio.Semaphore(GITHUB_MAX_CONCURRENT)
+    limiter = AsyncRateLimiter(GITHUB_REQUESTS_PER_SECOND)
 
-    async def fetch_one(client, f):
+    async def fetch_one(f):
         async with semaphore:
             try:
+                await limiter.acquire()
                 resp = await client.get(f["download_url"], headers={"User-Agent": USER_AGENT})
                 resp.raise_for_status()
-                await asyncio.sleep(0.3)
                 return {**f, "content": resp.text, "error": None}
             except Exception as e:
                 return {**f, "content": None, "error": str(e)}
 
-    async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
-        tasks = [fetch_one(client, f) for f in md_files]
-        results = await asyncio.gather(*tasks)
-
-    conn = sqlite3.connect(str(db_path))
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
-
     stats = {"pages": 0, "sections": 0, "code_examples": 0, "nodes": 0, "errors": 0}
 
-    for result in results:
+    # Store each file as soon as it arrives rather than after the slowest fetch
+    for next_result in asyncio.as_completed([fetch_one(f) for f in md_files]):
+        result = await next_result
         if result["error"]:
             print(f"  [ERROR] {result['path']}: {result['error']}")
             stats["errors"] += 1
@@ -221,7 +238,10 @@ async def scrape(db_path: Path) -> dict:
 
         url = path_to_docs_url(result["path"])
 
+        # content_html stays empty: readers fall back to the markdown in content
+
         try:
+            delete_page_nodes(conn, url)
             cursor = conn.execute(
                 """
                 INSERT OR REPLACE INTO pages (url, source, title, content, content_html, breadcrumbs, last_modified)
@@ -232,31 +252,14 @@ async def scrape(db_path: Path) -> dict:
             page_id = cursor.lastrowid
             stats["pages"] += 1
 
-            for section in data["sections"]:
-                conn.execute(
-                    "INSERT INTO sections (page_id, heading, level, content, anchor) VALUES (?, ?, ?, ?, ?)",
-                    (page_id, section["heading"], section["level"], section["content"], section["anchor"]),
-                )
-                stats["sections"] += 1
-
-            for ex in data["code_examples"]:
-                section_id = None
-                if ex.get("context"):
-                    row = conn.execute(
-                        "SELECT id FROM sections WHERE page_id = ? AND heading = ? LIMIT 1",
-                        (page_id, ex["context"]),
-                    ).fetchone()
-                    if row:
-                        section_id = row[0]
-
-                conn.execute(
-                    "INSERT INTO code_examples (page_id, section_id, language, code, context) VALUES (?, ?, ?, ?, ?)",
-                    (page_id, section_id, ex["language"], ex["code"], ex["context"]),
-                )
-                stats["code_examples"] += 1
+            insert_page_children(conn, page_id, data["sections"], data["code_examples"])
+            stats["sections"] += len(data["sections"])
+            stats["code_examples"] += len(data["code_examples"])
 
             node_info = extract_node_info(result["path"], data["title"])
             if node_info:
+                # Stored with its page, before the next await: the framework
+                # scraper may commit this shared connection at any await point
                 conn.execute(
                     "INSERT INTO nodes (name, display_name, category, description, page_id) VALUES (?, ?, ?, ?, ?)",
                     (
@@ -273,7 +276,6 @@ async def scrape(db_path: Path) -> dict:
             print(f"  [SKIP] {url}: {e}")
 
     conn.commit()
-    conn.close()
 
     print(
         f"[nodes-github] Done: {stats['pages']} pages, {stats['nodes']} nodes, "
@@ -285,4 +287,6 @@ async def scrape(db_path: Path) -> dict:
 
 if __name__ == "__main__":
     db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("griptape.db")
-    asyncio.run(scrape(db_path))
+    conn = get_writable_connection(db_path)
+    asyncio.run(scrape(conn))
+    conn.close()
@@ -61,6 +61,13 @@ def validate(db_path: Path) -> bool:
     except Exception as e:
         check("FTS search works", False, str(e))
 
+    # Check the node index is populated (search_nodes reads only nodes_fts)
+    try:
+        indexed = conn.execute("SELECT COUNT(*) FROM nodes_fts WHERE nodes_fts MATCH '\"image\"'").fetchone()[0]
+        check("Node FTS search works", indexed > 0, f"'image' matched {indexed} nodes")
+    except Exception as e:
+        check("Node FTS search works", False, str(e))
+
     # Check node categories
     categories = conn.execute("SELECT DISTINCT category FROM nodes ORDER BY category").fetchall()
     cat_list = [r[0] for r in categories]
@@ -1,9 +1,10 @@
 """Entry point for the Griptape MCP server."""
 
-from griptape_mcp.server import mcp
+from griptape_mcp.server import mcp, preload
 
 
 def main():
+    preload()
     mcp.run(transport="stdio")
 
 
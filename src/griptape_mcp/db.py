@@ -1,8 +1,13 @@
 """SQLite database module for Griptape documentation storage and retrieval."""
 
+import json
 import os
 import sqlite3
+import threading
+import weakref
+from collections.abc import Iterable
 from contextlib import contextmanager
+from functools import lru_cache, partial
 from importlib.resources import as_file, files
 from pathlib import Path
 
@@ -17,10 +22,24 @@ CREATE TABLE IF NOT EXISTS pages (
     source TEXT NOT NULL,
     title TEXT NOT NULL,
     content TEXT,
-    content_html TEXT,
+    content_html BLOB,  -- zlib-compressed UTF-8 HTML; not read by the server
     breadcrumbs TEXT,
     last_modified TEXT,
-    crawled_at TEXT DEFAULT (datetime('now'))
+    crawled_at TEXT DEFAULT (datetime('now')),
+    -- Framework docs area shown by list_categories
+    section_category TEXT GENERATED ALWAYS AS (
+        CASE
+            WHEN source != 'framework' THEN NULL
+            WHEN url LIKE '%/structures/%' THEN 'Structures'
+            WHEN url LIKE '%/tools/%' THEN 'Tools'
+            WHEN url LIKE '%/drivers/%' THEN 'Drivers'
+            WHEN url LIKE '%/engines/%' THEN 'Engines'
+            WHEN url LIKE '%/data/%' THEN 'Data'
+            WHEN url LIKE '%/misc/%' THEN 'Misc'
+            WHEN url LIKE '%/recipes/%' THEN 'Recipes'
+            ELSE 'Other'
+        END
+    ) STORED
 );
 
 -- Sections within pages (h2/h3/h4 level)
@@ -50,7 +69,12 @@ CREATE TABLE IF NOT EXISTS nodes (
     display_name TEXT,
     category TEXT NOT NULL,
     description TEXT,
-    page_id INTEGER REFERENCES pages(id) ON DELETE SET NULL
+    page_id INTEGER REFERENCES pages(id) ON DELETE SET NULL,
+    -- Space-stripped names, so 'LoadImage' finds 'Load Image' and vice versa
+    name_nospace TEXT GENERATED ALWAYS AS (REPLACE(name, ' ', '')) STORED,
+    display_name_nospace TEXT GENERATED ALWAYS AS (REPLACE(display_name, ' ', '')) STORED,
+    -- Lookup key for get_node_by_name: space-stripped and lower-cased
+    name_fold TEXT GENERATED ALWAYS AS (lower(REPLACE(name, ' ', ''))) STORED
 );
 
 -- Full-text search indexes
@@ -62,6 +86,17 @@ CREATE VIRTUAL TABLE IF NOT EXISTS sections_fts USING fts5(
     heading, content, content=sections, content_rowid=id
 );
 
+-- Code is matched on substrings too, so 'PromptDriver' finds 'OpenAiChatPromptDriver'
+CREATE VIRTUAL TABLE IF NOT EXISTS code_examples_fts USING fts5(
+    code, context, content=code_examples, content_rowid=id, tokenize='trigram'
+);
+
+-- Nodes are matched on substrings (trigram tokens, like LIKE '%q%')
+CREATE VIRTUAL TABLE IF NOT EXISTS nodes_fts USING fts5(
+    name, display_name, description, category, name_nospace, display_name_nospace,
+    content=nodes, content_rowid=id, tokenize='trigram'
+);
+
 -- Triggers to keep FTS in sync
 CREATE TRIGGER IF NOT EXISTS pages_ai AFTER INSERT ON pages BEGIN
     INSERT INTO pages_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
@@ -85,15 +120,55 @@ CREATE TRIGGER IF NOT EXISTS sections_au AFTER UPDATE ON sections BEGIN
     INSERT INTO sections_fts(rowid, heading, content) VALUES (new.id, new.heading, new.content);
 END;
 
+CREATE TRIGGER IF NOT EXISTS code_examples_ai AFTER INSERT ON code_examples BEGIN
+    INSERT INTO code_examples_fts(rowid, code, context) VALUES (new.id, new.code, new.context);
+END;
+CREATE TRIGGER IF NOT EXISTS code_examples_ad AFTER DELETE ON code_examples BEGIN
+    INSERT INTO code_examples_fts(code_examples_fts, rowid, code, context) VALUES('delete', old.id, old.code, old.context);
+END;
+CREATE TRIGGER IF NOT EXISTS code_examples_au AFTER UPDATE ON code_examples BEGIN
+    INSERT INTO code_examples_fts(code_examples_fts, rowid, code, context) VALUES('delete', old.id, old.code, old.context);
+    INSERT INTO code_examples_fts(rowid, code, context) VALUES (new.id, new.code, new.context);
+END;
+
+CREATE TRIGGER IF NOT EXISTS nodes_ai AFTER INSERT ON nodes BEGIN
+    INSERT INTO nodes_fts(rowid, name, display_name, description, category, name_nospace, display_name_nospace)
+    VALUES (new.id, new.name, new.display_name, new.description, new.category, new.name_nospace, new.display_name_nospace);
+END;
+CREATE TRIGGER IF NOT EXISTS nodes_ad AFTER DELETE ON nodes BEGIN
+    INSERT INTO nodes_fts(nodes_fts, rowid, name, display_name, description, category, name_nospace, display_name_nospace)
+    VALUES ('delete', old.id, old.name, old.display_name, old.description, old.category, old.name_nospace, old.display_name_nospace);
+END;
+CREATE TRIGGER IF NOT EXISTS nodes_au AFTER UPDATE ON nodes BEGIN
+    INSERT INTO nodes_fts(nodes_fts, rowid, name, display_name, description, category, name_nospace, display_name_nospace)
+    VALUES ('delete', old.id, old.name, old.display_name, old.description, old.category, old.name_nospace, old.display_name_nospace);
+    INSERT INTO nodes_fts(rowid, name, display_name, description, category, name_nospace, display_name_nospace)
+    VALUES (new.id, new.name, new.display_name, new.description, new.category, new.name_nospace, new.display_name_nospace);
+END;
+
 -- Indexes for common queries
 CREATE INDEX IF NOT EXISTS idx_pages_source ON pages(source);
 CREATE INDEX IF NOT EXISTS idx_pages_url ON pages(url);
+CREATE INDEX IF NOT EXISTS idx_pages_source_category ON pages(source, section_category);
 CREATE INDEX IF NOT EXISTS idx_sections_page_id ON sections(page_id);
+CREATE INDEX IF NOT EXISTS idx_sections_page_heading ON sections(page_id, heading);
 CREATE INDEX IF NOT EXISTS idx_code_examples_page_id ON code_examples(page_id);
+CREATE INDEX IF NOT EXISTS idx_code_examples_section_id ON code_examples(section_id);
 CREATE INDEX IF NOT EXISTS idx_nodes_category ON nodes(category);
 CREATE INDEX IF NOT EXISTS idx_nodes_name ON nodes(name);
+CREATE INDEX IF NOT EXISTS idx_nodes_name_fold ON nodes(name_fold);
+-- Unused since get_node_by_name moved to name_fold; drop it from older builds
+DROP INDEX IF EXISTS idx_nodes_name_nospace;
 """
 
+FTS_TABLES = ("pages_fts", "sections_fts", "code_examples_fts", "nodes_fts")
+
+# Stored in PRAGMA user_version. Bump it whenever SCHEMA_SQL changes in a way
+# that CREATE ... IF NOT EXISTS cannot apply to an existing file (new or
+# generated columns, new FTS tables): build_db then rebuilds from scratch
+# and the server refuses the stale file.
+SCHEMA_VERSION = 1
+
 
 def get_db_path() -> Path:
     """Get the path to the SQLite database.
@@ -119,32 +194,147 @@ def get_db_path() -> Path:
     return _bundled_db_path
 
 
-def get_connection(db_path: Path | None = None) -> sqlite3.Connection:
-    """Create a read-only SQLite connection to the documentation database."""
+class ReadConnection(sqlite3.Connection):
+    """Read-only connection returned by :func:`get_connection`.
+
+    ``immutable`` is set for the bundled database, which is opened with
+    ``immutable=1`` and so cannot change while the server runs.
+    ``snapshot_lock`` serialises :func:`read_snapshot` transactions between
+    threads sharing the connection.
+    """
+
+    immutable = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.snapshot_lock = threading.Lock()
+        # Query memos (see _cached); they live and die with the connection
+        self.caches: dict = {}
+
+
+def get_connection(db_path: Path | None = None) -> ReadConnection:
+    """Create a read-only SQLite connection to the documentation database.
+
+    The bundled database never changes at runtime, so it is opened with
+    ``immutable=1``: SQLite then skips file locking and change detection.
+    A GRIPTAPE_MCP_DB_PATH database may be rebuilt while the server runs,
+    so it is opened normally.
+
+    The connection is in autocommit mode and may be shared across threads:
+    SQLite serialises individual statements, and multi-statement reads go
+    through :func:`read_snapshot`, which holds the connection's lock.
+    """
     path = db_path or get_db_path()
-    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    immutable = path == _bundled_db_path
+    uri = f"file:{path}?mode=ro&immutable=1&cache=private" if immutable else f"file:{path}?mode=ro"
+    conn = sqlite3.connect(
+        uri,
+        uri=True,
+        isolation_level=None,
+        check_same_thread=False,
+        cached_statements=256,
+        factory=ReadConnection,
+    )
+    conn.immutable = immutable
+    if not immutable:
+        conn.execute("PRAGMA journal_mode=WAL")
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # Sorter scratch for ORDER BY rank stays in memory
+    conn.execute("PRAGMA temp_store=MEMORY")
+    # Map the file (256 MiB cap) so FTS segment reads skip pread() copies
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-20000")  # 20 MiB page cache
+    conn.execute("PRAGMA query_only=ON")
+    try:
+        check_schema(conn, path)
+    except sqlite3.DatabaseError:
+        conn.close()
+        raise
     return conn
 
 
 def get_writable_connection(db_path: Path) -> sqlite3.Connection:
-    """Create a writable SQLite connection (used by scrapers)."""
+    """Create a writable SQLite connection for building the database.
+
+    Durability is traded for speed: the file is a build artifact that
+    validate_db checks and ``build_db.py --force`` regenerates. WAL stays on
+    so an application crash still leaves a consistent database behind.
+    """
     conn = sqlite3.connect(str(db_path))
     conn.row_factory = sqlite3.Row
+    # Larger pages mean fewer overflow pages for long page/section text. Only
+    # takes effect on a new file, and must come before switching to WAL.
+    conn.execute("PRAGMA page_size=8192")
     conn.execute("PRAGMA journal_mode=WAL")
+    # Build-time only: the output is validated and can always be regenerated
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-200000")  # 200 MiB
+    conn.execute("PRAGMA mmap_size=1073741824")  # 1 GiB
     conn.execute("PRAGMA foreign_keys=ON")
     return conn
 
 
+def check_schema(conn: sqlite3.Connection, db_path: Path) -> None:
+    """Raise sqlite3.DatabaseError unless the database has the current schema."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version != SCHEMA_VERSION:
+        raise sqlite3.DatabaseError(
+            f"{db_path} has schema version {version}, but griptape-mcp needs version {SCHEMA_VERSION}. "
+            "Rebuild it with `python scripts/build_db.py --force`."
+        )
+
+
 def init_db(db_path: Path) -> sqlite3.Connection:
-    """Initialize a new database with the schema."""
+    """Initialize a new database with the schema.
+
+    On an existing file this only adds missing tables and indexes, so the
+    caller must first make sure it passes check_schema().
+    """
     conn = get_writable_connection(db_path)
     conn.executescript(SCHEMA_SQL)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
     return conn
 
 
+def drop_fts_triggers(conn: sqlite3.Connection) -> None:
+    """Drop the triggers that keep the FTS indexes in sync.
+
+    For bulk loads: rows then go in without per-row index updates, and
+    rebuild_fts() indexes everything once at the end. Only the
+    insert/delete/update triggers of the FTS_TABLES content tables are
+    dropped.
+    """
+    for table in FTS_TABLES:
+        content_table = table.removesuffix("_fts")
+        for suffix in ("ai", "ad", "au"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {content_table}_{suffix}")
+    conn.commit()
+
+
+def rebuild_fts(conn: sqlite3.Connection) -> None:
+    """Rebuild every FTS index from its content table and restore the sync triggers."""
+    for table in FTS_TABLES:
+        conn.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+    conn.commit()
+    conn.executescript(SCHEMA_SQL)
+
+
+def optimize_db(conn: sqlite3.Connection) -> None:
+    """Merge each FTS index into one segment and gather planner statistics.
+
+    Run once at the end of a build. The server opens the database read-only
+    (immutable when bundled), so it can neither run PRAGMA optimize nor see
+    its statistics drift; the sqlite_stat1 written here ships with the file.
+    """
+    for table in FTS_TABLES:
+        conn.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
 @contextmanager
 def read_db(db_path: Path | None = None):
     """Context manager for read-only database access."""
@@ -155,17 +345,59 @@ def read_db(db_path: Path | None = None):
         conn.close()
 
 
+@contextmanager
+def read_snapshot(conn: ReadConnection):
+    """Run several reads against one consistent snapshot of the database.
+
+    An immutable database needs no transaction for that. Otherwise the
+    BEGIN/COMMIT pair is held under the connection's lock, since another
+    thread's BEGIN on the shared connection would fail.
+    """
+    if conn.immutable:
+        yield conn
+        return
+    with conn.snapshot_lock:
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.execute("COMMIT")
+
+
+def warm_up(conn: sqlite3.Connection) -> None:
+    """Read every FTS index block once so the first search starts warm.
+
+    The indexes are a few MB, so this takes about a millisecond and faults
+    their pages into the OS cache / mmap region ahead of the first query.
+    Best-effort: a missing index is skipped, and its tools report the error.
+    """
+    for table in FTS_TABLES:
+        try:
+            conn.execute(f"SELECT sum(length(block)) FROM {table}_data").fetchone()
+        except sqlite3.OperationalError:
+            continue
+
+
 # --- Query helpers used by the MCP server ---
+#
+# Each helper passes a constant SQL string with ? placeholders. sqlite3 keeps
+# a per-connection cache of prepared statements keyed by SQL text, so every
+# distinct query here is parsed and planned once per connection and then
+# re-bound. Keep the SQL literal (no f-strings or string concatenation of
+# values) so that reuse holds.
 
 
 def search_pages(conn: sqlite3.Connection, query: str, source: str = "all", limit: int = 10) -> list[dict]:
-    """Full-text search across documentation pages."""
+    """Full-text search across documentation pages.
+
+    Rows carry no snippet: building one re-tokenizes the page, so callers ask
+    get_snippets() for just the rows they show.
+    """
     try:
         if source == "all":
             rows = conn.execute(
                 """
-                SELECT p.id, p.url, p.source, p.title,
-                       snippet(pages_fts, 1, '>>>','<<<', '...', 40) AS snippet
+                SELECT p.id, p.url, p.source, p.title
                 FROM pages_fts
                 JOIN pages p ON p.id = pages_fts.rowid
                 WHERE pages_fts MATCH ?
@@ -173,12 +405,11 @@ def search_pages(conn: sqlite3.Connection, query: str, source: str = "all", limi
                 LIMIT ?
                 """,
                 (query, limit),
-            ).fetchall()
+            )
         else:
             rows = conn.execute(
                 """
-                SELECT p.id, p.url, p.source, p.title,
-                       snippet(pages_fts, 1, '>>>','<<<', '...', 40) AS snippet
+                SELECT p.id, p.url, p.source, p.title
                 FROM pages_fts
                 JOIN pages p ON p.id = pages_fts.rowid
                 WHERE pages_fts MATCH ? AND p.source = ?
@@ -186,141 +417,218 @@ def search_pages(conn: sqlite3.Connection, query: str, source: str = "all", limi
                 LIMIT ?
                 """,
                 (query, source, limit),
-            ).fetchall()
+            )
         return [dict(row) for row in rows]
     except sqlite3.OperationalError:
         return []
 
 
+def _cached(conn: sqlite3.Connection, fn, maxsize: int):
+    """Return ``fn`` bound to ``conn``, memoised if the database is immutable.
+
+    Only the bundled database is guaranteed not to change under the server,
+    so any other connection runs every call. The memo is stored on the
+    connection and refers back to it weakly, so it never keeps it alive.
+    """
+    if not isinstance(conn, ReadConnection) or not conn.immutable:
+        return partial(fn, conn)
+    cache = conn.caches.get(fn)
+    if cache is None:
+        cache = conn.caches[fn] = lru_cache(maxsize=maxsize)(partial(fn, weakref.proxy(conn)))
+    return cache
+
+
+def _page_snippets(conn: sqlite3.Connection, query: str, page_ids: tuple[int, ...]) -> dict[int, str]:
+    rows = conn.execute(
+        """
+        SELECT rowid, snippet(pages_fts, 1, '>>>','<<<', '...', 40)
+        FROM pages_fts
+        WHERE pages_fts MATCH ? AND rowid IN (SELECT value FROM json_each(?))
+        """,
+        (query, json.dumps(page_ids)),
+    )
+    return dict(rows)
+
+
+def get_snippets(conn: sqlite3.Connection, query: str, page_ids: Iterable[int]) -> dict[int, str]:
+    """Get search snippets for pages matched by ``query``, keyed by page id.
+
+    One query covers all the pages, and on the bundled database results are
+    cached per (query, pages) since the same search is often repeated.
+    """
+    try:
+        return _cached(conn, _page_snippets, 256)(query, tuple(page_ids))
+    except sqlite3.OperationalError:
+        return {}
+
+
 def get_page_by_url(conn: sqlite3.Connection, url: str) -> dict | None:
     """Get a page by exact URL match."""
-    row = conn.execute("SELECT * FROM pages WHERE url = ?", (url,)).fetchone()
+    row = conn.execute("SELECT id, url, source, title, content FROM pages WHERE url = ?", (url,)).fetchone()
     return dict(row) if row else None
 
 
 def get_page_by_title(conn: sqlite3.Connection, title: str) -> dict | None:
     """Get a page by fuzzy title match."""
     row = conn.execute(
-        "SELECT * FROM pages WHERE title LIKE ? LIMIT 1",
+        "SELECT id, url, source, title, content FROM pages WHERE title LIKE ? LIMIT 1",
         (f"%{title}%",),
     ).fetchone()
     return dict(row) if row else None
 
 
+def _page_children(conn: sqlite3.Connection, page_id: int) -> tuple[tuple[dict, ...], tuple[dict, ...]]:
+    """Sections and code examples of a page, from a single UNION ALL query."""
+    sections: list[dict] = []
+    examples: list[dict] = []
+    rows = conn.execute(
+        """
+        SELECT 0 AS kind, id, heading, level, content, anchor,
+               NULL AS language, NULL AS code, NULL AS context
+        FROM sections WHERE page_id = ?
+        UNION ALL
+        SELECT 1, id, NULL, NULL, NULL, NULL, language, code, context
+        FROM code_examples WHERE page_id = ?
+        ORDER BY kind, id
+        """,
+        (page_id, page_id),
+    )
+    for kind, row_id, heading, level, content, anchor, language, code, context in rows:
+        if kind == 0:
+            sections.append({"id": row_id, "heading": heading, "level": level, "content": content, "anchor": anchor})
+        else:
+            examples.append({"id": row_id, "language": language, "code": code, "context": context})
+    return tuple(sections), tuple(examples)
+
+
 def get_page_sections(conn: sqlite3.Connection, page_id: int) -> list[dict]:
     """Get all sections for a page."""
-    rows = conn.execute(
-        "SELECT * FROM sections WHERE page_id = ? ORDER BY id",
-        (page_id,),
-    ).fetchall()
-    return [dict(row) for row in rows]
+    return list(_cached(conn, _page_children, 512)(page_id)[0])
 
 
 def get_page_code_examples(conn: sqlite3.Connection, page_id: int) -> list[dict]:
     """Get all code examples for a page."""
-    rows = conn.execute(
-        "SELECT * FROM code_examples WHERE page_id = ? ORDER BY id",
-        (page_id,),
-    ).fetchall()
-    return [dict(row) for row in rows]
+    return list(_cached(conn, _page_children, 512)(page_id)[1])
+
+
+def _fts_phrase(text: str) -> str:
+    """Quote text as a single FTS5 phrase."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def get_page_bundle(conn: sqlite3.Connection, url_or_title: str) -> tuple[dict | None, list[dict], list[dict]]:
+    """Get a page (by URL, else fuzzy title) with its sections and code examples.
+
+    On the bundled database the children are cached per page and shared with
+    get_page_sections and get_page_code_examples, so get_page and
+    get_node_details on the same page only query them once.
+    """
+    with read_snapshot(conn):
+        if url_or_title.startswith("http"):
+            page = get_page_by_url(conn, url_or_title)
+        else:
+            page = get_page_by_title(conn, url_or_title)
+        if not page:
+            return None, [], []
+        sections, examples = _cached(conn, _page_children, 512)(page["id"])
+    return page, list(sections), list(examples)
 
 
 def search_nodes(conn: sqlite3.Connection, query: str, category: str | None = None, limit: int = 20) -> list[dict]:
     """Search Griptape Nodes by name/description/category.
 
-    Handles spaced queries like 'Load Image' matching 'LoadImage'.
+    Substring matches come from the trigram nodes_fts index, best first
+    (name hits outweigh description hits). Handles spaced queries like
+    'Load Image' matching 'LoadImage'.
     """
-    like = f"%{query}%"
     stripped = query.replace(" ", "")
-    stripped_like = f"%{stripped}%"
 
-    if category:
+    # Trigrams need at least three characters; the nodes table is small
+    # enough to scan for shorter queries
+    if len(stripped) < 3:
+        like = f"%{query}%"
         rows = conn.execute(
             """
-            SELECT n.*, p.url FROM nodes n
+            SELECT n.name, n.display_name, n.category, n.description, p.url FROM nodes n
             LEFT JOIN pages p ON p.id = n.page_id
-            WHERE n.category = ? AND (
-                n.name LIKE ? OR n.display_name LIKE ? OR n.description LIKE ?
-                OR REPLACE(n.name, ' ', '') LIKE ?
-                OR REPLACE(n.display_name, ' ', '') LIKE ?
+            WHERE (? IS NULL OR n.category = ?) AND (
+                n.name LIKE ? OR n.display_name LIKE ? OR n.description LIKE ? OR n.category LIKE ?
             )
             ORDER BY n.name
             LIMIT ?
             """,
-            (category, like, like, like, stripped_like, stripped_like, limit),
-        ).fetchall()
-    else:
-        rows = conn.execute(
-            """
-            SELECT n.*, p.url FROM nodes n
-            LEFT JOIN pages p ON p.id = n.page_id
-            WHERE n.name LIKE ? OR n.display_name LIKE ?
-                OR n.description LIKE ? OR n.category LIKE ?
-                OR REPLACE(n.name, ' ', '') LIKE ?
-                OR REPLACE(n.display_name, ' ', '') LIKE ?
-            ORDER BY n.name
-            LIMIT ?
-            """,
-            (like, like, like, like, stripped_like, stripped_like, limit),
-        ).fetchall()
+            (category, category, like, like, like, like, limit),
+        )
+        return [dict(row) for row in rows]
 
-    # Fallback: split multi-word queries into individual words
-    if not rows and " " in query:
-        seen_ids: set[int] = set()
-        combined: list[sqlite3.Row] = []
-        for word in query.split():
-            if len(word) < 2:
-                continue
-            word_like = f"%{word}%"
-            word_rows = conn.execute(
+    def match(expression: str) -> list[dict]:
+        try:
+            cursor = conn.execute(
                 """
-                SELECT n.*, p.url FROM nodes n
+                SELECT n.name, n.display_name, n.category, n.description, p.url FROM nodes_fts
+                JOIN nodes n ON n.id = nodes_fts.rowid
                 LEFT JOIN pages p ON p.id = n.page_id
-                WHERE n.name LIKE ? OR n.display_name LIKE ? OR n.description LIKE ?
-                ORDER BY n.name
+                WHERE nodes_fts MATCH ? AND (? IS NULL OR n.category = ?)
+                ORDER BY bm25(nodes_fts, 10.0, 10.0, 1.0, 2.0, 10.0, 10.0)
                 LIMIT ?
                 """,
-                (word_like, word_like, word_like, limit),
-            ).fetchall()
-            for r in word_rows:
-                if r["id"] not in seen_ids:
-                    seen_ids.add(r["id"])
-                    combined.append(r)
-        rows = combined[:limit]
+                (expression, category, category, limit),
+            )
+            return [dict(row) for row in cursor]
+        except sqlite3.OperationalError:
+            return []
+
+    columns = "{name display_name description}" if category else "{name display_name description category}"
+    rows = match(
+        f"{columns}: {_fts_phrase(query)} OR {{name_nospace display_name_nospace}}: {_fts_phrase(stripped)}"
+    )
+
+    # Fallback: any of the individual words of a multi-word query, as one
+    # OR expression so FTS5 unions, dedupes and ranks the hits in a single
+    # statement. Words under three characters cannot match a trigram index.
+    if not rows and " " in query:
+        words = list(dict.fromkeys(word.lower() for word in query.split() if len(word) >= 3))
+        if words:
+            rows = match(f"{{name display_name description}}: ({' OR '.join(_fts_phrase(w) for w in words)})")
 
-    return [dict(row) for row in rows]
+    return rows
 
 
 def get_node_by_name(conn: sqlite3.Connection, name: str) -> dict | None:
     """Get a node by name with progressive fuzzy matching.
 
-    Tries exact match, then LIKE, then space-stripped match so that
+    Tries exact match, then a prefix of the folded name (space-stripped,
+    lower-cased; shortest first), then a substring of it, so that
     'Load Image' finds 'LoadImage' and vice versa.
     """
     # 1. Exact match on name or display_name
     row = conn.execute(
-        "SELECT n.*, p.url, p.content FROM nodes n LEFT JOIN pages p ON p.id = n.page_id "
+        "SELECT n.name, n.display_name, n.category, n.description, n.page_id, p.url, p.content "
+        "FROM nodes n LEFT JOIN pages p ON p.id = n.page_id "
         "WHERE n.name = ? OR n.display_name = ? LIMIT 1",
         (name, name),
     ).fetchone()
     if row:
         return dict(row)
 
-    # 2. LIKE match (partial)
+    key = name.replace(" ", "").lower()
+
+    # 2. Folded-name prefix, as an index range scan (also covers folded equality)
     row = conn.execute(
-        "SELECT n.*, p.url, p.content FROM nodes n LEFT JOIN pages p ON p.id = n.page_id "
-        "WHERE n.name LIKE ? OR n.display_name LIKE ? LIMIT 1",
-        (f"%{name}%", f"%{name}%"),
+        "SELECT n.name, n.display_name, n.category, n.description, n.page_id, p.url, p.content "
+        "FROM nodes n LEFT JOIN pages p ON p.id = n.page_id "
+        "WHERE n.name_fold >= ? AND n.name_fold < ? ORDER BY length(n.name_fold), n.id LIMIT 1",
+        (key, key + "\U0010ffff"),
     ).fetchone()
     if row:
         return dict(row)
 
-    # 3. Space-stripped match ('Load Image' → 'LoadImage')
-    stripped = name.replace(" ", "")
+    # 3. Folded-name substring ('image' → 'LoadImage')
     row = conn.execute(
-        "SELECT n.*, p.url, p.content FROM nodes n LEFT JOIN pages p ON p.id = n.page_id "
-        "WHERE REPLACE(n.name, ' ', '') LIKE ? OR REPLACE(n.display_name, ' ', '') LIKE ? LIMIT 1",
-        (f"%{stripped}%", f"%{stripped}%"),
+        "SELECT n.name, n.display_name, n.category, n.description, n.page_id, p.url, p.content "
+        "FROM nodes n LEFT JOIN pages p ON p.id = n.page_id "
+        "WHERE instr(n.name_fold, ?) > 0 ORDER BY n.id LIMIT 1",
+        (key,),
     ).fetchone()
     if row:
         return dict(row)
@@ -330,33 +638,22 @@ def get_node_by_name(conn: sqlite3.Connection, name: str) -> dict | None:
 
 def list_all_categories(conn: sqlite3.Connection) -> dict:
     """List all framework sections and node categories with counts."""
-    framework_rows = conn.execute(
+    result: dict[str, list[dict]] = {"framework_sections": [], "node_categories": []}
+    rows = conn.execute(
         """
-        SELECT
-            CASE
-                WHEN url LIKE '%/structures/%' THEN 'Structures'
-                WHEN url LIKE '%/tools/%' THEN 'Tools'
-                WHEN url LIKE '%/drivers/%' THEN 'Drivers'
-                WHEN url LIKE '%/engines/%' THEN 'Engines'
-                WHEN url LIKE '%/data/%' THEN 'Data'
-                WHEN url LIKE '%/misc/%' THEN 'Misc'
-                WHEN url LIKE '%/recipes/%' THEN 'Recipes'
-                ELSE 'Other'
-            END AS category,
-            COUNT(*) AS count
+        SELECT 'framework_sections' AS kind, section_category AS category, COUNT(*) AS count
         FROM pages WHERE source = 'framework'
-        GROUP BY category ORDER BY count DESC
+        GROUP BY section_category
+        UNION ALL
+        SELECT 'node_categories', category, COUNT(*)
+        FROM nodes
+        GROUP BY category
+        ORDER BY kind, count DESC, category
         """
-    ).fetchall()
-
-    node_rows = conn.execute(
-        "SELECT category, COUNT(*) AS count FROM nodes GROUP BY category ORDER BY count DESC"
-    ).fetchall()
-
-    return {
-        "framework_sections": [dict(r) for r in framework_rows],
-        "node_categories": [dict(r) for r in node_rows],
-    }
+    )
+    for kind, category, count in rows:
+        result[kind].append({"category": category, "count": count})
+    return result
 
 
 def search_code_examples(conn: sqlite3.Connection, query: str, limit: int = 10) -> list[dict]:
@@ -365,13 +662,13 @@ def search_code_examples(conn: sqlite3.Connection, query: str, limit: int = 10)
     Layer 1: Section FTS — matches sections linked to code examples.
     Layer 2: Page FTS — matches pages, returns their code examples (catches
              the ~67% of examples with no section_id).
-    Layer 3: Code text LIKE — direct search on code content for class names,
-             imports, etc.
+    Layer 3: Code text substring — direct search on code content for class
+             names, imports, etc. (trigram FTS).
     """
     seen: set[int] = set()
     results: list[dict] = []
 
-    def _collect(rows: list[sqlite3.Row]) -> None:
+    def _collect(rows: Iterable[sqlite3.Row]) -> None:
         for row in rows:
             r = dict(row)
             ce_id = r.pop("ce_id", None)
@@ -381,7 +678,9 @@ def search_code_examples(conn: sqlite3.Connection, query: str, limit: int = 10)
                 seen.add(ce_id)
             results.append(r)
 
-    # Layer 1: section FTS → code_examples via section_id
+    # Layer 1: section FTS → code_examples via section_id. Examples of the
+    # same section tie on rank; ce.id keeps them in page order whatever join
+    # order the planner picks (Layer 2 orders its page ties the same way).
     try:
         _collect(
             conn.execute(
@@ -393,11 +692,11 @@ def search_code_examples(conn: sqlite3.Connection, query: str, limit: int = 10)
                 JOIN code_examples ce ON ce.section_id = s.id
                 JOIN pages p ON p.id = ce.page_id
                 WHERE sections_fts MATCH ?
-                ORDER BY rank
+                ORDER BY rank, ce.id
                 LIMIT ?
                 """,
                 (query, limit),
-            ).fetchall()
+            )
         )
     except sqlite3.OperationalError:
         pass
@@ -415,17 +714,37 @@ def search_code_examples(conn: sqlite3.Connection, query: str, limit: int = 10)
                     JOIN code_examples ce ON ce.page_id = p.id
                     LEFT JOIN sections s ON s.id = ce.section_id
                     WHERE pages_fts MATCH ?
-                    ORDER BY rank
+                    ORDER BY rank, ce.id
                     LIMIT ?
                     """,
                     (query, limit - len(results)),
-                ).fetchall()
+                )
             )
         except sqlite3.OperationalError:
             pass
 
-    # Layer 3: direct LIKE search on code text and context
-    if len(results) < limit:
+    # Layer 3: substring search on code text and context
+    if len(results) < limit and len(query) >= 3:
+        try:
+            _collect(
+                conn.execute(
+                    """
+                    SELECT ce.id AS ce_id, ce.language, ce.code, ce.context,
+                           s.heading, p.title, p.url
+                    FROM code_examples_fts
+                    JOIN code_examples ce ON ce.id = code_examples_fts.rowid
+                    JOIN pages p ON p.id = ce.page_id
+                    LEFT JOIN sections s ON s.id = ce.section_id
+                    WHERE code_examples_fts MATCH ?
+                    LIMIT ?
+                    """,
+                    (_fts_phrase(query), limit - len(results)),
+                )
+            )
+        except sqlite3.OperationalError:
+            pass
+    elif len(results) < limit:
+        # Too short for trigrams: scan instead
         like_pattern = f"%{query}%"
         _collect(
             conn.execute(
@@ -439,7 +758,7 @@ def search_code_examples(conn: sqlite3.Connection, query: str, limit: int = 10)
                 LIMIT ?
                 """,
                 (like_pattern, like_pattern, limit - len(results)),
-            ).fetchall()
+            )
         )
 
     return results[:limit]
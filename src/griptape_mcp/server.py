@@ -1,18 +1,24 @@
 """MCP server exposing Griptape documentation to LLMs."""
 
+import sqlite3
+import sys
+from collections.abc import Iterable, Iterator
+from functools import lru_cache, wraps
+
 from mcp.server.fastmcp import FastMCP
 
 from griptape_mcp.db import (
     get_connection,
     get_node_by_name,
-    get_page_by_title,
-    get_page_by_url,
+    get_page_bundle,
     get_page_code_examples,
-    get_page_sections,
+    get_snippets,
     list_all_categories,
+    read_snapshot,
     search_code_examples,
     search_nodes as db_search_nodes,
     search_pages,
+    warm_up,
 )
 
 mcp = FastMCP("griptape-docs")
@@ -21,6 +27,10 @@ _conn = None
 
 MAX_QUERY_LENGTH = 1000
 
+# Responses are memoised only for the bundled database: it cannot change
+# while the server runs, whereas a GRIPTAPE_MCP_DB_PATH file may be rebuilt.
+TOOL_CACHE_SIZE = 256
+
 
 def _get_conn():
     global _conn
@@ -29,6 +39,37 @@ def _get_conn():
     return _conn
 
 
+def preload() -> None:
+    """Open the database and warm its FTS indexes before serving requests.
+
+    Called at startup so the connection and cold-cache cost is paid during
+    the MCP handshake rather than by the first tool call. It never stops the
+    server from starting: if the database cannot be opened, the error is
+    logged to stderr and each tool call reports it.
+    """
+    try:
+        warm_up(_get_conn())
+    except (sqlite3.Error, OSError, ValueError) as e:
+        print(f"griptape-mcp: {e}", file=sys.stderr)
+
+
+def _memoised(maxsize: int = TOOL_CACHE_SIZE):
+    """Memoise a tool's response when the database is immutable."""
+
+    def decorator(fn):
+        cached = lru_cache(maxsize=maxsize)(fn)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _get_conn().immutable:
+                return cached(*args, **kwargs)
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
 def _validate_query(query: str) -> str | None:
     """Validate a search query. Returns an error message or None if valid."""
     if not query or not query.strip():
@@ -38,7 +79,33 @@ def _validate_query(query: str) -> str | None:
     return None
 
 
-@mcp.tool()
+def _node_lines(nodes: Iterable[dict]) -> Iterator[str]:
+    """Render nodes as a markdown list, one blank line after each entry."""
+    for n in nodes:
+        yield f"- **{n.get('display_name') or n['name']}** [{n['category']}]"
+        if n.get("description"):
+            yield f"  {n['description']}"
+        if n.get("url"):
+            yield f"  Docs: {n['url']}"
+        yield ""
+
+
+def _code_example_lines(examples: Iterable[dict]) -> Iterator[str]:
+    """Render code examples as fenced blocks, each preceded by its context."""
+    for ex in examples:
+        lang = ex.get("language", "python")
+        if ex.get("context"):
+            yield f"\n{ex['context']}"
+        yield f"\n```{lang}"
+        yield ex["code"]
+        yield "```"
+
+
+# Tools return plain markdown text. They are registered with
+# structured_output=False so FastMCP sends that text once, as a TextContent
+# block, instead of also echoing it as {"result": ...} structured content.
+@mcp.tool(structured_output=False)
+@_memoised()
 def search_docs(query: str, source: str = "all") -> str:
     """Search across all Griptape documentation.
 
@@ -53,21 +120,24 @@ def search_docs(query: str, source: str = "all") -> str:
         return err
     if source not in ("framework", "nodes", "all"):
         return "Error: source must be 'framework', 'nodes', or 'all'."
-    results = search_pages(_get_conn(), query, source)
+    conn = _get_conn()
+    results = search_pages(conn, query, source)
     if not results:
         return f"No results found for '{query}'"
 
+    snippets = get_snippets(conn, query, [r["id"] for r in results])
     lines = [f"Found {len(results)} result(s) for '{query}':\n"]
     for r in results:
         lines.append(f"- **{r['title']}** [{r['source']}]")
         lines.append(f"  URL: {r['url']}")
-        if r.get("snippet"):
-            lines.append(f"  {r['snippet']}")
+        if snippets.get(r["id"]):
+            lines.append(f"  {snippets[r['id']]}")
         lines.append("")
     return "\n".join(lines)
 
 
-@mcp.tool()
+@mcp.tool(structured_output=False)
+@_memoised()
 def get_page(url_or_title: str) -> str:
     """Get the full content of a specific documentation page.
 
@@ -81,19 +151,10 @@ def get_page(url_or_title: str) -> str:
         return "Error: url_or_title must be a non-empty string."
     if len(url_or_title) > MAX_QUERY_LENGTH:
         return f"Error: input too long (max {MAX_QUERY_LENGTH} characters)."
-    conn = _get_conn()
-
-    if url_or_title.startswith("http"):
-        page = get_page_by_url(conn, url_or_title)
-    else:
-        page = get_page_by_title(conn, url_or_title)
-
+    page, sections, examples = get_page_bundle(_get_conn(), url_or_title)
     if not page:
         return f"No page found matching '{url_or_title}'"
 
-    sections = get_page_sections(conn, page["id"])
-    examples = get_page_code_examples(conn, page["id"])
-
     lines = [
         f"# {page['title']}",
         f"Source: {page['source']} | URL: {page['url']}",
@@ -114,18 +175,13 @@ def get_page(url_or_title: str) -> str:
 
     if examples:
         lines.append("\n## Code Examples")
-        for ex in examples:
-            lang = ex.get("language", "python")
-            if ex.get("context"):
-                lines.append(f"\n{ex['context']}")
-            lines.append(f"\n```{lang}")
-            lines.append(ex["code"])
-            lines.append("```")
+        lines.extend(_code_example_lines(examples))
 
     return "\n".join(lines)
 
 
-@mcp.tool()
+@mcp.tool(structured_output=False)
+@_memoised()
 def search_griptape_nodes(query: str, category: str | None = None) -> str:
     """Search Griptape Nodes by name, description, or category.
 
@@ -146,17 +202,12 @@ def search_griptape_nodes(query: str, category: str | None = None) -> str:
         return msg
 
     lines = [f"Found {len(results)} node(s):\n"]
-    for n in results:
-        lines.append(f"- **{n.get('display_name') or n['name']}** [{n['category']}]")
-        if n.get("description"):
-            lines.append(f"  {n['description']}")
-        if n.get("url"):
-            lines.append(f"  Docs: {n['url']}")
-        lines.append("")
+    lines.extend(_node_lines(results))
     return "\n".join(lines)
 
 
-@mcp.tool()
+@mcp.tool(structured_output=False)
+@_memoised()
 def get_node_details(node_name: str) -> str:
     """Get full documentation for a specific Griptape Node.
 
@@ -169,20 +220,16 @@ def get_node_details(node_name: str) -> str:
     if err := _validate_query(node_name):
         return err
     conn = _get_conn()
-    node = get_node_by_name(conn, node_name)
+    with read_snapshot(conn):
+        node = get_node_by_name(conn, node_name)
+        examples = get_page_code_examples(conn, node["page_id"]) if node and node.get("page_id") else []
 
     if not node:
         # Auto-fallback: search for similar nodes instead of giving up
         similar = db_search_nodes(conn, node_name)
         if similar:
             lines = [f"No exact match for '{node_name}', but found similar nodes:\n"]
-            for n in similar[:5]:
-                lines.append(f"- **{n.get('display_name') or n['name']}** [{n['category']}]")
-                if n.get("description"):
-                    lines.append(f"  {n['description']}")
-                if n.get("url"):
-                    lines.append(f"  Docs: {n['url']}")
-                lines.append("")
+            lines.extend(_node_lines(similar[:5]))
             lines.append("Use one of these exact names to get full details.")
             return "\n".join(lines)
         return f"No node found matching '{node_name}'. Try search_griptape_nodes() to browse available nodes."
@@ -201,22 +248,15 @@ def get_node_details(node_name: str) -> str:
     if node.get("content"):
         lines.append(f"\n## Full Documentation\n{node['content']}")
 
-    if node.get("page_id"):
-        examples = get_page_code_examples(conn, node["page_id"])
-        if examples:
-            lines.append("\n## Code Examples")
-            for ex in examples:
-                lang = ex.get("language", "python")
-                if ex.get("context"):
-                    lines.append(f"\n{ex['context']}")
-                lines.append(f"\n```{lang}")
-                lines.append(ex["code"])
-                lines.append("```")
+    if examples:
+        lines.append("\n## Code Examples")
+        lines.extend(_code_example_lines(examples))
 
     return "\n".join(lines)
 
 
-@mcp.tool()
+@mcp.tool(structured_output=False)
+@_memoised(maxsize=1)
 def list_categories() -> str:
     """List all Griptape Framework sections and Node categories.
 
@@ -236,7 +276,8 @@ def list_categories() -> str:
     return "\n".join(lines)
 
 
-@mcp.tool()
+@mcp.tool(structured_output=False)
+@_memoised()
 def get_code_examples(topic: str) -> str:
     """Search for code examples related to a topic.
 